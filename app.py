@@ -1,129 +1,291 @@
 import streamlit as st
 import requests
+import httpx
+from requests.adapters import HTTPAdapter
 import json
+import orjson
 import yaml
 import pandas as pd
 import time
+import math
+import asyncio
+import hashlib
 from datetime import datetime
-import re
-from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Prefer the libyaml C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
+# HTTP methods that test cases can be generated for and executed with
+HTTP_METHODS = frozenset({'get', 'post', 'put', 'delete', 'patch'})
+
+# Minimum seconds between progress updates while tests run (~20 Hz)
+PROGRESS_UPDATE_INTERVAL = 0.05
+
+# Maximum number of response body bytes read and kept per test
+RESPONSE_BODY_LIMIT = 2048
+
+# Number of failed tests rendered per page of the report
+FAILED_TESTS_PAGE_SIZE = 25
+
+# Maximum number of test requests coalesced into one batch endpoint call
+BATCH_MAX_SIZE = 10
 
 st.set_page_config(page_title="API Testing Agent", layout="wide")
 
+def create_session(max_workers=5):
+    """Create a requests session whose connection pool is shared by all test workers"""
+    session = requests.Session()
+    # Keep-alive connections are reused across tests; retries are disabled so
+    # every test sees the server's first response. Each host's pool holds one
+    # connection per worker so no worker waits on another's connection.
+    adapter = HTTPAdapter(
+        pool_connections=max(4, max_workers // 4),
+        pool_maxsize=max_workers,
+        max_retries=0,
+        pool_block=False
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+@st.cache_data(show_spinner=False, max_entries=8)
 def parse_openapi_spec(spec_content):
     """Parse OpenAPI/Swagger specification from YAML or JSON"""
-    try:
-        # Try parsing as JSON first
-        return json.loads(spec_content)
-    except json.JSONDecodeError:
-        # If not JSON, try YAML
+    # A JSON document must start with an object or array, so only attempt JSON
+    # for those instead of parsing every YAML spec twice
+    stripped = spec_content.lstrip()
+    if stripped[:1] in ('{', '['):
         try:
-            return yaml.safe_load(spec_content)
-        except yaml.YAMLError as e:
-            st.error(f"Failed to parse specification: {str(e)}")
-            return None
+            return orjson.loads(stripped)
+        except json.JSONDecodeError:
+            pass  # Flow-style YAML can start with a bracket too
+    
+    try:
+        return yaml.load(spec_content, Loader=YamlSafeLoader)
+    except yaml.YAMLError as e:
+        st.error(f"Failed to parse specification: {str(e)}")
+        return None
 
-def generate_test_cases(spec):
-    """Generate test cases from OpenAPI specification"""
+@st.cache_data(show_spinner=False, max_entries=4)
+def parse_direct_config(config_text, config_format):
+    """Parse the simplified Direct Input configuration from YAML or JSON"""
+    if config_format == "JSON":
+        return orjson.loads(config_text)
+    return yaml.load(config_text, Loader=YamlSafeLoader)
+
+def expected_status_codes(status):
+    """Normalize an expected status (a code, an 'NXX' range, or a list of them) to a set of ints"""
+    codes = set()
+    for value in (status if isinstance(status, list) else [status]):
+        value = str(value).upper()
+        if value.isdigit():
+            codes.add(int(value))
+        elif len(value) == 3 and value[0].isdigit() and value[1:] == 'XX':
+            codes.update(range(int(value[0]) * 100, int(value[0]) * 100 + 100))
+    # Anything else (e.g. an OpenAPI 'default' response) matches no status code
+    return frozenset(codes)
+
+def build_base_case(path, method, operation, base_url, default_security, security_schemes, batch_endpoint=None):
+    """Build the test case template for a single endpoint operation.
+    
+    Error variants are derived from the template by unpacking it into new
+    dicts, so the template itself is never mutated once returned."""
+    method = method.upper()
+    test_case = {
+        'path': path,
+        'method': method,
+        'name': operation.get('summary', f"{method} {path}"),
+        'description': operation.get('description', ''),
+        'request': {
+            'url': f"{base_url}{path}",
+            'headers': {},
+            'params': {},
+            'body': None
+        },
+        'expected': {
+            'status': next(iter(operation.get('responses') or ()), "200")
+        }
+    }
+    test_case['expected_codes'] = expected_status_codes(test_case['expected']['status'])
+    
+    # Add authentication if required
+    security = operation.get('security', default_security)
+    if security:
+        auth_scheme = list(security[0].keys())[0] if security[0] else None
+        if auth_scheme:
+            test_case['auth_required'] = True
+            if auth_scheme in security_schemes:
+                scheme = security_schemes[auth_scheme]
+                if scheme.get('type') == 'apiKey':
+                    test_case['auth_type'] = 'apiKey'
+                    test_case['auth_name'] = scheme.get('name')
+                    test_case['auth_in'] = scheme.get('in')
+                elif scheme.get('type') == 'http' and scheme.get('scheme') == 'bearer':
+                    test_case['auth_type'] = 'bearer'
+    
+    # Add parameters
+    parameters = operation.get('parameters', [])
+    test_case['request']['params'] = {p.get('name'): None for p in parameters if p.get('in') == 'query'}
+    test_case['request']['headers'] = {p.get('name'): None for p in parameters if p.get('in') == 'header'}
+    required_params = [p.get('name') for p in parameters if p.get('required', False)]
+    if required_params:
+        test_case['required_params'] = required_params
+    
+    # Handle request body
+    request_body = operation.get('requestBody', {})
+    if request_body:
+        content = request_body.get('content', {})
+        for content_type, content_schema in content.items():
+            test_case['request']['headers']['Content-Type'] = content_type
+            # Generate a sample body based on schema
+            schema = content_schema.get('schema', {})
+            if schema:
+                test_case['request']['body'] = {}
+                # In a real implementation, you would generate a sample based on the schema
+    
+    # Allow the request to be coalesced with others through the batch endpoint
+    if batch_endpoint:
+        test_case['batch_endpoint'] = batch_endpoint
+        test_case['batch_eligible'] = operation.get('x-batch-eligible', True)
+    
+    return test_case
+
+def build_cases_for_path(path, path_item, base_url, default_security, security_schemes, batch_endpoint=None):
+    """Build the test cases for every operation of a single path"""
     test_cases = []
     
+    for method, operation in path_item.items():
+        method = method.lower()
+        if method not in HTTP_METHODS:
+            continue
+        
+        # Create a base test case for this endpoint
+        template = build_base_case(path, method, operation, base_url, default_security, security_schemes, batch_endpoint)
+        test_cases.append(template)
+        
+        # Create additional test cases for error conditions
+        # 1. Missing required parameters
+        if template.get('required_params'):
+            test_cases.append({
+                **template,
+                'name': f"{template['name']} - Missing Required Parameters",
+                'request': {**template['request'], 'params': {}},
+                'expected': {'status': "400"},
+                'expected_codes': frozenset({400})
+            })
+        
+        # 2. Invalid authentication
+        if template.get('auth_required'):
+            test_cases.append({
+                **template,
+                'name': f"{template['name']} - Invalid Authentication",
+                'auth_value': "invalid_auth_value",
+                'expected': {'status': "401"},
+                'expected_codes': frozenset({401})
+            })
+    
+    return test_cases
+
+def generate_test_cases(spec):
+    """Generate test cases from OpenAPI specification"""
     # Extract base URL
     servers = spec.get('servers', [])
     base_url = servers[0]['url'] if servers else ""
     
+    paths = spec.get('paths', {})
+    default_security = spec.get('security', [])
+    security_schemes = spec.get('components', {}).get('securitySchemes', {})
+    
+    # Optional endpoint accepting an array of sub-requests (x-batch-endpoint extension)
+    batch_endpoint = spec.get('x-batch-endpoint')
+    if batch_endpoint and batch_endpoint.startswith('/'):
+        batch_endpoint = f"{base_url}{batch_endpoint}"
+    
     # Process each path and method
-    for path, path_item in spec.get('paths', {}).items():
-        for method, operation in path_item.items():
-            if method.lower() not in ['get', 'post', 'put', 'delete', 'patch']:
-                continue
-                
-            # Create a base test case for this endpoint
-            test_case = {
-                'path': path,
-                'method': method.upper(),
-                'name': operation.get('summary', f"{method.upper()} {path}"),
-                'description': operation.get('description', ''),
-                'request': {
-                    'url': f"{base_url}{path}",
-                    'headers': {},
-                    'params': {},
-                    'body': None
-                },
-                'expected': {
-                    'status': list(operation.get('responses', {}).keys())[0] if operation.get('responses') else "200"
-                }
-            }
-            
-            # Add authentication if required
-            security = operation.get('security', spec.get('security', []))
-            if security:
-                auth_scheme = list(security[0].keys())[0] if security[0] else None
-                if auth_scheme:
-                    test_case['auth_required'] = True
-                    security_schemes = spec.get('components', {}).get('securitySchemes', {})
-                    if auth_scheme in security_schemes:
-                        scheme = security_schemes[auth_scheme]
-                        if scheme.get('type') == 'apiKey':
-                            test_case['auth_type'] = 'apiKey'
-                            test_case['auth_name'] = scheme.get('name')
-                            test_case['auth_in'] = scheme.get('in')
-                        elif scheme.get('type') == 'http' and scheme.get('scheme') == 'bearer':
-                            test_case['auth_type'] = 'bearer'
-            
-            # Add parameters
-            parameters = operation.get('parameters', [])
-            for param in parameters:
-                param_name = param.get('name')
-                param_in = param.get('in')
-                required = param.get('required', False)
-                
-                if param_in == 'query':
-                    # For query parameters
-                    test_case['request']['params'][param_name] = None
-                elif param_in == 'header':
-                    # For header parameters
-                    test_case['request']['headers'][param_name] = None
-                
-                if required:
-                    test_case['required_params'] = test_case.get('required_params', [])
-                    test_case['required_params'].append(param_name)
-            
-            # Handle request body
-            request_body = operation.get('requestBody', {})
-            if request_body:
-                content = request_body.get('content', {})
-                for content_type, content_schema in content.items():
-                    test_case['request']['headers']['Content-Type'] = content_type
-                    # Generate a sample body based on schema
-                    schema = content_schema.get('schema', {})
-                    if schema:
-                        test_case['request']['body'] = {}
-                        # In a real implementation, you would generate a sample based on the schema
-            
-            test_cases.append(test_case)
-            
-            # Create additional test cases for error conditions
-            # 1. Missing required parameters
-            if test_case.get('required_params'):
-                error_test = test_case.copy()
-                error_test['name'] = f"{test_case['name']} - Missing Required Parameters"
-                error_test['request'] = test_case['request'].copy()
-                error_test['request']['params'] = {}
-                error_test['expected']['status'] = "400"
-                test_cases.append(error_test)
-                
-            # 2. Invalid authentication
-            if test_case.get('auth_required'):
-                error_test = test_case.copy()
-                error_test['name'] = f"{test_case['name']} - Invalid Authentication"
-                error_test['request'] = test_case['request'].copy()
-                error_test['auth_value'] = "invalid_auth_value"
-                error_test['expected']['status'] = "401"
-                test_cases.append(error_test)
+    test_cases = []
+    for path, path_item in paths.items():
+        test_cases.extend(build_cases_for_path(path, path_item, base_url, default_security, security_schemes, batch_endpoint))
     
     return test_cases
 
-def execute_test(test_case, auth_values):
+def with_auth(headers, params, test_case, auth_values):
+    """Return headers and params with the test case's credentials filled in.
+    
+    Copies are only made when credentials are added, so test cases without
+    authentication share their request dicts with the test case itself."""
+    if not test_case.get('auth_required'):
+        return headers, params
+    
+    # Invalid authentication variants carry their own credential value
+    override = test_case.get('auth_value')
+    auth_type = test_case.get('auth_type')
+    if auth_type == 'apiKey':
+        auth_name = test_case.get('auth_name')
+        auth_in = test_case.get('auth_in')
+        auth_value = override if override is not None else auth_values.get('apiKey')
+        
+        if auth_in == 'header':
+            headers = {**headers, auth_name: auth_value}
+        elif auth_in == 'query':
+            params = {**params, auth_name: auth_value}
+    elif auth_type == 'bearer':
+        token = override if override is not None else auth_values.get('bearer')
+        headers = {**headers, 'Authorization': f"Bearer {token}"}
+    
+    return headers, params
+
+def prepare_request(test_case, auth_values):
+    """Build the HTTP request for a test case, filling in authentication"""
+    url = test_case['request']['url']
+    method = test_case['method'].lower()
+    if method not in HTTP_METHODS:
+        raise ValueError(f"Unsupported HTTP method: {test_case['method']}")
+    
+    body = test_case['request']['body']
+    
+    # Fill in authentication
+    headers, params = with_auth(test_case['request']['headers'], test_case['request']['params'], test_case, auth_values)
+    
+    request_kwargs = {
+        'url': url,
+        'headers': headers,
+        'params': params
+    }
+    
+    if body is not None and method in ['post', 'put', 'patch']:
+        request_kwargs['json'] = body
+    
+    request_info = {
+        'url': url,
+        'method': method,
+        'headers': headers,
+        'params': params,
+        'body': body
+    }
+    
+    return method, request_kwargs, request_info
+
+def record_response(result, test_case, status_code, headers, body):
+    """Store the response on the result and validate it against the expected status"""
+    result['response'] = {
+        'status_code': status_code,
+        'headers': dict(headers),
+        'body': body
+    }
+    
+    # Validate
+    passed = status_code in test_case['expected_codes']
+    
+    result['passed'] = passed
+    result['status'] = 'Passed' if passed else 'Failed'
+
+def execute_test(test_case, auth_values, session):
     """Execute a single test case"""
     result = {
         'test_name': test_case['name'],
@@ -134,74 +296,163 @@ def execute_test(test_case, auth_values):
     }
     
     try:
-        # Prepare request
-        url = test_case['request']['url']
-        method = test_case['method'].lower()
-        headers = test_case['request']['headers'].copy()
-        params = test_case['request']['params'].copy()
-        body = test_case['request']['body']
+        method, request_kwargs, result['request'] = prepare_request(test_case, auth_values)
         
-        # Fill in authentication
-        if test_case.get('auth_required'):
-            auth_type = test_case.get('auth_type')
-            if auth_type == 'apiKey':
-                auth_name = test_case.get('auth_name')
-                auth_in = test_case.get('auth_in')
-                auth_value = auth_values.get('apiKey')
-                
-                if auth_in == 'header':
-                    headers[auth_name] = auth_value
-                elif auth_in == 'query':
-                    params[auth_name] = auth_value
-            elif auth_type == 'bearer':
-                headers['Authorization'] = f"Bearer {auth_values.get('bearer')}"
+        # Stream the response so only the truncated body is ever downloaded
+        response = session.request(method.upper(), stream=True, **request_kwargs)
+        try:
+            body = response.raw.read(RESPONSE_BODY_LIMIT, decode_content=True)
+        finally:
+            response.close()
+        
+        # urllib3 1.x returns everything the compressed bytes read expand to
+        body = body[:RESPONSE_BODY_LIMIT]
+        try:
+            body = body.decode(response.encoding or 'utf-8', errors='replace')
+        except LookupError:
+            # Unknown charset; fall back to UTF-8 as response.text does
+            body = body.decode('utf-8', errors='replace')
+        record_response(result, test_case, response.status_code, response.headers, body)
         
-        # Make the request
-        request_kwargs = {
-            'url': url,
-            'headers': headers,
-            'params': params
+    except Exception as e:
+        result['error'] = str(e)
+        result['passed'] = False
+        result['status'] = 'Error'
+    
+    result['end_time'] = datetime.now()
+    result['duration'] = (result['end_time'] - result['start_time']).total_seconds()
+    
+    return result
+
+def group_batches(test_cases):
+    """Split test cases into batches for their batch endpoint and tests to run individually"""
+    groups = defaultdict(list)
+    single_tests = []
+    
+    for test_case in test_cases:
+        if test_case.get('batch_endpoint') and test_case.get('batch_eligible'):
+            host = urlsplit(test_case['request']['url']).netloc
+            groups[(test_case['batch_endpoint'], host)].append(test_case)
+        else:
+            single_tests.append(test_case)
+    
+    batches = [
+        group[i:i + BATCH_MAX_SIZE]
+        for group in groups.values()
+        for i in range(0, len(group), BATCH_MAX_SIZE)
+    ]
+    return batches, single_tests
+
+def execute_batch(test_cases, auth_values, session):
+    """Execute a group of test cases with a single request to their batch endpoint.
+    
+    Sub-responses are matched to test cases by position. If the server has no
+    batch endpoint (404), the test cases are executed individually instead."""
+    results = []
+    batch = []
+    sub_requests = []
+    start_time = datetime.now()
+    
+    for test_case in test_cases:
+        result = {
+            'test_name': test_case['name'],
+            'path': test_case['path'],
+            'method': test_case['method'],
+            'start_time': start_time,
+            'status': 'Pending'
         }
         
-        if body is not None and method in ['post', 'put', 'patch']:
-            request_kwargs['json'] = body
+        try:
+            method, request_kwargs, result['request'] = prepare_request(test_case, auth_values)
+        except Exception as e:
+            result['error'] = str(e)
+            result['passed'] = False
+            result['status'] = 'Error'
+            result['end_time'] = datetime.now()
+            result['duration'] = (result['end_time'] - result['start_time']).total_seconds()
+            results.append(result)
+            continue
         
-        result['request'] = {
-            'url': url,
-            'method': method,
-            'headers': headers,
-            'params': params,
-            'body': body
-        }
+        # Describe the request relative to the host, with its query string encoded
+        prepared = requests.Request(method.upper(), request_kwargs['url'], params=request_kwargs['params']).prepare()
+        sub_requests.append({
+            'method': method.upper(),
+            'path': prepared.path_url,
+            'headers': {k: v for k, v in request_kwargs['headers'].items() if v is not None},
+            'body': request_kwargs.get('json')
+        })
+        batch.append((test_case, result))
+    
+    if not batch:
+        return results
+    
+    try:
+        response = session.post(
+            test_cases[0]['batch_endpoint'],
+            data=orjson.dumps(sub_requests, option=orjson.OPT_NON_STR_KEYS),
+            headers={'Content-Type': 'application/json'}
+        )
         
-        response = None
-        if method == 'get':
-            response = requests.get(**request_kwargs)
-        elif method == 'post':
-            response = requests.post(**request_kwargs)
-        elif method == 'put':
-            response = requests.put(**request_kwargs)
-        elif method == 'delete':
-            response = requests.delete(**request_kwargs)
-        elif method == 'patch':
-            response = requests.patch(**request_kwargs)
+        if response.status_code == 404:
+            # No batch support on this server; fall back to individual requests
+            return results + [execute_test(test_case, auth_values, session) for test_case, _ in batch]
         
-        # Process response
-        result['response'] = {
-            'status_code': response.status_code,
-            'headers': dict(response.headers),
-            'body': response.text[:1000]  # Truncate long responses
-        }
+        response.raise_for_status()
+        sub_responses = orjson.loads(response.content)
+        if not isinstance(sub_responses, list) or len(sub_responses) != len(batch):
+            raise ValueError(f"Batch endpoint returned an unexpected response for {len(batch)} requests")
         
-        # Validate
-        expected_status = test_case['expected']['status']
-        if isinstance(expected_status, list):
-            passed = str(response.status_code) in expected_status
-        else:
-            passed = str(response.status_code) == str(expected_status)
+        for (test_case, result), sub_response in zip(batch, sub_responses):
+            body = sub_response.get('body')
+            if body is None:
+                body = ''
+            elif not isinstance(body, str):
+                body = orjson.dumps(body).decode()
+            record_response(result, test_case, sub_response.get('status'), sub_response.get('headers') or {}, body[:RESPONSE_BODY_LIMIT])
+    
+    except Exception as e:
+        for _, result in batch:
+            result['error'] = str(e)
+            result['passed'] = False
+            result['status'] = 'Error'
+    
+    # Every test in the batch shares the batch request's timing
+    end_time = datetime.now()
+    for _, result in batch:
+        result['end_time'] = end_time
+        result['duration'] = (end_time - start_time).total_seconds()
+        results.append(result)
+    
+    return results
+
+async def execute_test_async(test_case, auth_values, client):
+    """Execute a single test case on an httpx.AsyncClient"""
+    result = {
+        'test_name': test_case['name'],
+        'path': test_case['path'],
+        'method': test_case['method'],
+        'start_time': datetime.now(),
+        'status': 'Pending'
+    }
+    
+    try:
+        method, request_kwargs, result['request'] = prepare_request(test_case, auth_values)
+        
+        # requests silently drops None-valued headers and params; httpx would
+        # send them as empty strings, so drop them here to match
+        request_kwargs['headers'] = {k: v for k, v in request_kwargs['headers'].items() if v is not None}
+        request_kwargs['params'] = {k: v for k, v in request_kwargs['params'].items() if v is not None}
+        
+        # Stream the response so only the truncated body is ever downloaded
+        async with client.stream(method.upper(), timeout=30, **request_kwargs) as response:
+            body = b''
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) >= RESPONSE_BODY_LIMIT:
+                    break
         
-        result['passed'] = passed
-        result['status'] = 'Passed' if passed else 'Failed'
+        body = body[:RESPONSE_BODY_LIMIT].decode(response.encoding or 'utf-8', errors='replace')
+        record_response(result, test_case, response.status_code, response.headers, body)
         
     except Exception as e:
         result['error'] = str(e)
@@ -213,45 +464,108 @@ def execute_test(test_case, auth_values):
     
     return result
 
-def run_tests(test_cases, auth_values, max_workers=5):
-    """Run all test cases with progress tracking"""
+async def run_tests_async(test_cases, auth_values, max_workers, progress_bar, status_text):
+    """Run all test cases concurrently on a single event loop"""
+    results = []
+    total_tests = len(test_cases)
+    semaphore = asyncio.Semaphore(max_workers * 4)
+    limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    
+    async with httpx.AsyncClient(http2=True, limits=limits) as client:
+        async def run_bounded(test):
+            async with semaphore:
+                return await execute_test_async(test, auth_values, client)
+        
+        tasks = [asyncio.create_task(run_bounded(test)) for test in test_cases]
+        last_update = 0.0
+        
+        for completed, coro in enumerate(asyncio.as_completed(tasks), start=1):
+            result = await coro
+            results.append(result)
+            
+            now = time.monotonic()
+            if now - last_update > PROGRESS_UPDATE_INTERVAL:
+                status_text.text(f"Completed test: {result['test_name']}")
+                progress_bar.progress(completed / total_tests)
+                last_update = now
+    
+    return results
+
+def run_tests(test_cases, auth_values, max_workers=5, use_async=False):
+    """Run all test cases with progress tracking.
+    
+    Test cases with a batch endpoint are coalesced into batch requests on the
+    threaded path; the async path multiplexes individual requests instead."""
     results = []
     total_tests = len(test_cases)
     
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_test = {executor.submit(execute_test, test, auth_values): test for test in test_cases}
-        completed = 0
-        
-        for future in future_to_test:
-            test_case = future_to_test[future]
-            status_text.text(f"Running test: {test_case['name']}")
-            
-            try:
-                result = future.result()
-                results.append(result)
-            except Exception as e:
-                results.append({
-                    'test_name': test_case['name'],
-                    'path': test_case['path'],
-                    'method': test_case['method'],
-                    'error': str(e),
-                    'passed': False,
-                    'status': 'Error'
-                })
+    if use_async:
+        results = asyncio.run(run_tests_async(test_cases, auth_values, max_workers, progress_bar, status_text))
+    else:
+        with create_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            batches, single_tests = group_batches(test_cases)
+            future_to_tests = {executor.submit(execute_test, test, auth_values, session): [test] for test in single_tests}
+            future_to_tests.update({executor.submit(execute_batch, batch, auth_values, session): batch for batch in batches})
+            completed = 0
+            last_update = 0.0
             
-            completed += 1
-            progress_bar.progress(completed / total_tests)
+            for future in as_completed(future_to_tests):
+                tests = future_to_tests[future]
+                
+                try:
+                    outcome = future.result()
+                    results.extend(outcome if isinstance(outcome, list) else [outcome])
+                except Exception as e:
+                    results.extend({
+                        'test_name': test_case['name'],
+                        'path': test_case['path'],
+                        'method': test_case['method'],
+                        'error': str(e),
+                        'passed': False,
+                        'status': 'Error'
+                    } for test_case in tests)
+                
+                completed += len(tests)
+                
+                # Throttle UI updates so Streamlit re-renders don't dominate the loop
+                now = time.monotonic()
+                if now - last_update > PROGRESS_UPDATE_INTERVAL:
+                    status_text.text(f"Completed test: {tests[-1]['name']}")
+                    progress_bar.progress(completed / total_tests)
+                    last_update = now
     
+    progress_bar.progress(1.0)
     status_text.text(f"Completed all {total_tests} tests")
     return results
 
 def generate_report(results):
     """Generate a detailed report of test results"""
     total_tests = len(results)
-    passed_tests = sum(1 for r in results if r.get('passed', False))
+    passed_tests = 0
+    execution_time = 0
+    
+    # Group by endpoint, tallying the summary in the same pass
+    endpoint_results = defaultdict(lambda: {
+        'total': 0,
+        'passed': 0,
+        'failed': 0,
+        'tests': []
+    })
+    for result in results:
+        endpoint_data = endpoint_results[f"{result['method']} {result['path']}"]
+        endpoint_data['total'] += 1
+        if result.get('passed', False):
+            endpoint_data['passed'] += 1
+            passed_tests += 1
+        else:
+            endpoint_data['failed'] += 1
+        
+        endpoint_data['tests'].append(result)
+        execution_time += result.get('duration', 0)
+    
     failed_tests = total_tests - passed_tests
     
     # Create summary
@@ -260,35 +574,19 @@ def generate_report(results):
         'passed_tests': passed_tests,
         'failed_tests': failed_tests,
         'success_rate': round(passed_tests / total_tests * 100, 2) if total_tests > 0 else 0,
-        'execution_time': sum(r.get('duration', 0) for r in results if 'duration' in r)
+        'execution_time': execution_time
     }
     
-    # Group by endpoint
-    endpoint_results = {}
-    for result in results:
-        endpoint = f"{result['method']} {result['path']}"
-        if endpoint not in endpoint_results:
-            endpoint_results[endpoint] = {
-                'total': 0,
-                'passed': 0,
-                'failed': 0,
-                'tests': []
-            }
-        
-        endpoint_results[endpoint]['total'] += 1
-        if result.get('passed', False):
-            endpoint_results[endpoint]['passed'] += 1
-        else:
-            endpoint_results[endpoint]['failed'] += 1
-        
-        endpoint_results[endpoint]['tests'].append(result)
-    
     return {
         'summary': summary,
-        'endpoint_results': endpoint_results,
+        'endpoint_results': dict(endpoint_results),
         'results': results
     }
 
+def report_source_key(*inputs):
+    """Fingerprint of the inputs a report was generated from"""
+    return hashlib.blake2b("\0".join(inputs).encode(), digest_size=16).hexdigest()
+
 def display_report(report):
     """Display the test report in Streamlit"""
     st.header("Test Results Summary")
@@ -302,57 +600,97 @@ def display_report(report):
     
     st.write(f"Total execution time: {report['summary']['execution_time']:.2f} seconds")
     
-    # Results by endpoint
+    # Results by endpoint, rendered as tables rather than a widget per test
     st.header("Results by Endpoint")
     
-    for endpoint, data in report['endpoint_results'].items():
-        with st.expander(f"{endpoint} - {data['passed']}/{data['total']} passed"):
-            for test in data['tests']:
-                if test.get('passed', False):
-                    st.success(test['test_name'])
-                else:
-                    st.error(f"{test['test_name']} - {test.get('status', 'Failed')}")
-                    
-                    # Show details for failed tests directly (no nested expander)
-                    st.write("Request Details:")
-                    if 'request' in test:
-                        st.json(test['request'])
-                    
-                    st.write("Response Details:")
-                    if 'response' in test:
-                        st.json(test['response'])
-                    
-                    if 'error' in test:
-                        st.write("Error:")
-                        st.code(test['error'])
+    st.dataframe(pd.DataFrame([
+        {
+            'endpoint': endpoint,
+            'passed': data['passed'],
+            'failed': data['failed'],
+            'total': data['total']
+        }
+        for endpoint, data in report['endpoint_results'].items()
+    ]), use_container_width=True, hide_index=True)
     
-    # Failed tests in detail
+    if report['results']:
+        results_df = pd.DataFrame([
+            {
+                'details': False,
+                'test_name': r['test_name'],
+                'method': r['method'],
+                'path': r['path'],
+                'status': r.get('status', 'Failed'),
+                'status_code': r.get('response', {}).get('status_code'),
+                'duration': r.get('duration', 0.0)
+            }
+            for r in report['results']
+        ])
+        edited_df = st.data_editor(
+            results_df,
+            use_container_width=True,
+            hide_index=True,
+            disabled=[column for column in results_df.columns if column != 'details'],
+            column_config={
+                'details': st.column_config.CheckboxColumn("Details", help="Show request and response details"),
+                'status': st.column_config.TextColumn("Status")
+            }
+        )
+        
+        # Only the tests ticked in the table get a detailed view
+        for index in edited_df.index[edited_df['details']]:
+            test = report['results'][index]
+            with st.expander(f"{test['test_name']} - {test.get('status', 'Failed')}", expanded=True):
+                st.write("Request Details:")
+                if 'request' in test:
+                    st.json(test['request'])
+                
+                st.write("Response Details:")
+                if 'response' in test:
+                    st.json(test['response'])
+                
+                if 'error' in test:
+                    st.write("Error:")
+                    st.code(test['error'])
+    
+    # Failed tests in detail, paginated so only one page of failures is rendered
     st.header("Failed Tests in Detail")
     failed_tests = [r for r in report['results'] if not r.get('passed', False)]
     
     if failed_tests:
-        for test in failed_tests:
+        page_count = math.ceil(len(failed_tests) / FAILED_TESTS_PAGE_SIZE)
+        page = 1
+        if page_count > 1:
+            page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1)
+        page_start = (page - 1) * FAILED_TESTS_PAGE_SIZE
+        page_tests = failed_tests[page_start:page_start + FAILED_TESTS_PAGE_SIZE]
+        
+        for index, test in enumerate(page_tests, start=page_start):
             with st.expander(f"{test['test_name']} - {test['method']} {test['path']}"):
+                show_headers = st.checkbox(f"Show headers for {test['test_name']}", key=f"failed_test_headers_{index}")
                 cols = st.columns(2)
                 
                 with cols[0]:
                     st.subheader("Request")
-                    st.write("URL:", test['request']['url'])
-                    st.write("Method:", test['request']['method'].upper())
-                    st.write("Headers:")
-                    st.json(test['request'].get('headers', {}))
-                    st.write("Query Parameters:")
-                    st.json(test['request'].get('params', {}))
-                    if test['request'].get('body'):
-                        st.write("Body:")
-                        st.json(test['request']['body'])
+                    if 'request' in test:
+                        st.write("URL:", test['request']['url'])
+                        st.write("Method:", test['request']['method'].upper())
+                        if show_headers:
+                            st.write("Headers:")
+                            st.json(test['request'].get('headers', {}))
+                        st.write("Query Parameters:")
+                        st.json(test['request'].get('params', {}))
+                        if test['request'].get('body'):
+                            st.write("Body:")
+                            st.json(test['request']['body'])
                 
                 with cols[1]:
                     st.subheader("Response")
                     if 'response' in test:
                         st.write("Status Code:", test['response'].get('status_code', 'Unknown'))
-                        st.write("Headers:")
-                        st.json(test['response'].get('headers', {}))
+                        if show_headers:
+                            st.write("Headers:")
+                            st.json(test['response'].get('headers', {}))
                         st.write("Body:")
                         st.code(test['response'].get('body', 'No response'))
                     
@@ -371,7 +709,7 @@ def display_report(report):
     # Download full report as JSON
     st.download_button(
         label="Download Full Report (JSON)",
-        data=json.dumps(report, default=str, indent=2),
+        data=orjson.dumps(report, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS),
         file_name=f"api_test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
         mime="application/json"
     )
@@ -393,12 +731,21 @@ with st.sidebar:
         'apiKey': api_key,
         'bearer': bearer_token
     }
+    
+    # Execution options
+    st.subheader("Execution")
+    max_workers = st.slider("Concurrent requests", min_value=1, max_value=32, value=5)
+    use_async = st.checkbox("Use async HTTP/2 client", value=False)
+
+# Identifies the current spec or configuration, so a stored report is only shown for its own input
+report_source = None
 
 if input_method == "Upload OpenAPI/Swagger Spec":
     uploaded_file = st.file_uploader("Upload OpenAPI/Swagger Specification", type=["json", "yaml", "yml"])
     
     if uploaded_file is not None:
         spec_content = uploaded_file.read().decode("utf-8")
+        report_source = report_source_key(input_method, spec_content)
         spec = parse_openapi_spec(spec_content)
         
         if spec:
@@ -424,18 +771,35 @@ if input_method == "Upload OpenAPI/Swagger Spec":
             # Run tests button
             if st.button("Run Tests"):
                 with st.spinner("Running tests..."):
-                    results = run_tests(test_cases, auth_values)
-                    report = generate_report(results)
-                
-                # Display report OUTSIDE the expander to fix Streamlit nesting issue
-                st.subheader("Test Report")
-                display_report(report)
+                    results = run_tests(test_cases, auth_values, max_workers=max_workers, use_async=use_async)
+                    # Keep the report across reruns so the report's own widgets stay usable
+                    st.session_state['report'] = generate_report(results)
+                    st.session_state['report_source'] = report_source
 
 else:  # Direct Input
     st.subheader("API Specification")
     
-    with st.expander("Simplified YAML Configuration Format", expanded=True):
-        st.code('''
+    config_format = st.radio("Configuration Format", ["YAML", "JSON"], horizontal=True)
+    
+    with st.expander(f"Simplified {config_format} Configuration Format", expanded=True):
+        if config_format == "JSON":
+            st.code('''
+{
+  "apis": [
+    {
+      "endpoint": "/users",
+      "method": "GET",
+      "auth": "bearer_token",
+      "test_cases": [
+        {"name": "valid request", "expected_status": 200},
+        {"name": "invalid pagination", "query_params": {"page": -1}, "expected_status": 400}
+      ]
+    }
+  ]
+}
+        ''', language="json")
+        else:
+            st.code('''
 apis:
   - endpoint: /users
     method: GET
@@ -448,17 +812,22 @@ apis:
         expected_status: 400
         ''', language="yaml")
     
-    yaml_input = st.text_area("Enter API Configuration YAML", height=300)
+    config_input = st.text_area(f"Enter API Configuration {config_format}", height=300)
+    if config_input:
+        report_source = report_source_key(input_method, config_format, config_input)
     
-    if yaml_input and st.button("Generate Tests"):
+    if config_input and st.button("Generate Tests"):
         try:
-            yaml_data = yaml.safe_load(yaml_input)
+            config_data = parse_direct_config(config_input, config_format)
             
             # Convert simplified format to test cases
             test_cases = []
-            base_url = yaml_data.get('base_url', 'http://localhost:8000')
+            base_url = config_data.get('base_url', 'http://localhost:8000')
+            batch_endpoint = config_data.get('batch_endpoint')
+            if batch_endpoint and batch_endpoint.startswith('/'):
+                batch_endpoint = f"{base_url}{batch_endpoint}"
             
-            for api in yaml_data.get('apis', []):
+            for api in config_data.get('apis', []):
                 endpoint = api.get('endpoint')
                 method = api.get('method', 'GET')
                 auth_type = api.get('auth')
@@ -478,6 +847,7 @@ apis:
                             'status': tc.get('expected_status', '200')
                         }
                     }
+                    test_case['expected_codes'] = expected_status_codes(test_case['expected']['status'])
                     
                     # Add authentication if specified
                     if auth_type:
@@ -489,6 +859,10 @@ apis:
                         elif auth_type == 'bearer_token':
                             test_case['auth_type'] = 'bearer'
                     
+                    if batch_endpoint:
+                        test_case['batch_endpoint'] = batch_endpoint
+                        test_case['batch_eligible'] = tc.get('batch_eligible', True)
+                    
                     test_cases.append(test_case)
             
             st.success(f"Generated {len(test_cases)} test cases")
@@ -504,12 +878,20 @@ apis:
             # Run tests button
             if st.button("Run Tests"):
                 with st.spinner("Running tests..."):
-                    results = run_tests(test_cases, auth_values)
-                    report = generate_report(results)
-                
-                # Display report OUTSIDE the expander to fix Streamlit nesting issue
-                st.subheader("Test Report")
-                display_report(report)
+                    results = run_tests(test_cases, auth_values, max_workers=max_workers, use_async=use_async)
+                    # Keep the report across reruns so the report's own widgets stay usable
+                    st.session_state['report'] = generate_report(results)
+                    st.session_state['report_source'] = report_source
 
         except Exception as e:
-            st.error(f"Error parsing YAML: {str(e)}")
+            st.error(f"Error parsing {config_format}: {str(e)}")
+
+# Drop a report left over from a different spec or configuration
+if st.session_state.get('report_source') != report_source:
+    st.session_state.pop('report', None)
+    st.session_state.pop('report_source', None)
+
+# Display report OUTSIDE the expanders to fix Streamlit nesting issue
+if 'report' in st.session_state:
+    st.subheader("Test Report")
+    display_report(st.session_state['report'])
@@ -1,16 +1,25 @@
 # sample_apis.py
-from fastapi import FastAPI, HTTPException, Header, Query, Depends, status
+from fastapi import FastAPI, HTTPException, Header, Query, Depends, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Iterable, Iterator
 import uvicorn
+import os
+import hashlib
 import uuid
+import itertools
+import orjson
+import threading
+from array import array
+from collections import OrderedDict
 import time
 from datetime import datetime
 
 app = FastAPI(
     title="Sample APIs for Testing",
     description="A collection of sample APIs to test the API Testing Agent",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # ---------- Sample Data ----------
@@ -26,7 +35,142 @@ products_db = [
     {"id": 3, "name": "Headphones", "price": 79.99, "stock": 200}
 ]
 
-orders_db = []
+class OrdersStore:
+    """Orders stored column-wise in parallel arrays, with an ID index for O(1) lookups"""
+    
+    def __init__(self):
+        self.user_ids = array("q")
+        self.totals = array("d")
+        self.items: List[List[dict]] = []
+        self.created_at: List[str] = []
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def append(self, order: dict):
+        # ids is extended after the other columns and the index entry added last, so
+        # unlocked readers only ever see positions that are complete in every column
+        with self.lock:
+            self.user_ids.append(order["user_id"])
+            self.totals.append(order["total"])
+            self.items.append(order["items"])
+            self.created_at.append(order["created_at"])
+            self.ids.append(order["id"])
+            self.index[order["id"]] = len(self.ids) - 1
+    
+    def record(self, i: int) -> dict:
+        return {
+            "id": self.ids[i],
+            "user_id": self.user_ids[i],
+            "items": self.items[i],
+            "total": self.totals[i],
+            "created_at": self.created_at[i]
+        }
+    
+    def get(self, order_id: str) -> Optional[dict]:
+        i = self.index.get(order_id)
+        return None if i is None else self.record(i)
+    
+    def records(self) -> Iterator[dict]:
+        # Orders appended while iterating are not included
+        return (self.record(i) for i in range(len(self)))
+
+orders_db = OrdersStore()
+
+# Users by ID, kept in step with users_db by add_user/remove_user
+users_by_id = {user["id"]: user for user in users_db}
+
+# IDs for new users; next() on an itertools.count is atomic under the GIL,
+# so concurrent requests in the threadpool never receive the same ID
+user_ids = itertools.count(max((user["id"] for user in users_db), default=0) + 1)
+
+# ---------- Response Cache ----------
+class LRUCache(OrderedDict):
+    """Dict that evicts its least recently used entry once it holds max_size entries"""
+    
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+    
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.max_size:
+            self.popitem(last=False)
+
+# Serialized GET responses and their ETags, dropped whenever the data behind them changes
+user_cache: Dict[int, Tuple[bytes, str]] = {}
+# Keyed by client-chosen query parameters, so its size is bounded
+users_list_cache: Dict[tuple, Tuple[bytes, str]] = LRUCache(max_size=64)
+order_cache: Dict[str, Tuple[bytes, str]] = {}
+orders_list_cache: Dict[tuple, Tuple[bytes, str]] = {}
+# Held across every cache lookup-and-populate and every write-and-invalidate,
+# so a reader can't store an entry built from data a writer has since replaced
+cache_lock = threading.Lock()
+
+# Order lists longer than this are streamed instead of serialized and cached whole
+ORDERS_STREAM_THRESHOLD = 1000
+
+def cache_entry(data: Any) -> Tuple[bytes, str]:
+    content = orjson.dumps(data)
+    return content, f'"{hashlib.blake2b(content, digest_size=8).hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match is a comma-separated list compared weakly, or "*" for any
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == "*" or tag == etag:
+            return True
+    return False
+
+def json_response(entry: Tuple[bytes, str], request: Request) -> Response:
+    content, etag = entry
+    # The client already holds this representation
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=content, media_type="application/json", headers={"ETag": etag})
+
+def stream_json_array(records: Iterable[dict]):
+    yield b"["
+    for i, record in enumerate(records):
+        if i:
+            yield b","
+        yield orjson.dumps(record)
+    yield b"]"
+
+def invalidate_user(user_id: int):
+    # Caller holds cache_lock
+    user_cache.pop(user_id, None)
+    users_list_cache.clear()
+
+def add_user(user: dict):
+    with cache_lock:
+        users_db.append(user)
+        users_by_id[user["id"]] = user
+        users_list_cache.clear()
+
+def remove_user(user_id: int) -> bool:
+    # Returns False if the user was already gone
+    with cache_lock:
+        user = users_by_id.pop(user_id, None)
+        if user is None:
+            return False
+        users_db.remove(user)
+        invalidate_user(user_id)
+        return True
 
 # ---------- Models ----------
 class User(BaseModel):
@@ -98,25 +242,33 @@ def read_root():
 # ----- User Endpoints -----
 @app.get("/users", response_model=List[User], tags=["Users"])
 def get_users(
+    request: Request,
     active: Optional[bool] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100)
 ):
-    if skip > len(users_db):
-        return []
+    key = (active, skip, limit)
+    with cache_lock:
+        entry = users_list_cache.get(key)
+        if entry is None:
+            filtered = users_db
+            if active is not None:
+                filtered = [user for user in users_db if user["active"] == active]
+            
+            entry = users_list_cache[key] = cache_entry(filtered[skip:skip+limit])
     
-    filtered = users_db
-    if active is not None:
-        filtered = [user for user in users_db if user["active"] == active]
-        
-    return filtered[skip:skip+limit]
+    return json_response(entry, request)
 
 @app.get("/users/{user_id}", response_model=User, tags=["Users"])
-def get_user(user_id: int):
-    for user in users_db:
-        if user["id"] == user_id:
-            return user
-    raise HTTPException(status_code=404, detail="User not found")
+def get_user(user_id: int, request: Request):
+    with cache_lock:
+        entry = user_cache.get(user_id)
+        if entry is None:
+            if user_id not in users_by_id:
+                raise HTTPException(status_code=404, detail="User not found")
+            entry = user_cache[user_id] = cache_entry(users_by_id[user_id])
+    
+    return json_response(entry, request)
 
 @app.post("/users", response_model=User, status_code=201, tags=["Users"])
 def create_user(user: UserCreate, api_key: str = Depends(verify_api_key)):
@@ -126,12 +278,12 @@ def create_user(user: UserCreate, api_key: str = Depends(verify_api_key)):
     
     # Create new user
     new_user = {
-        "id": len(users_db) + 1,
+        "id": next(user_ids),
         "username": user.username,
         "email": user.email,
         "active": True
     }
-    users_db.append(new_user)
+    add_user(new_user)
     return new_user
 
 @app.put("/users/{user_id}", response_model=User, tags=["Users"])
@@ -140,25 +292,27 @@ def update_user(
     user: UserCreate, 
     token: str = Depends(verify_token)
 ):
-    for i, existing_user in enumerate(users_db):
-        if existing_user["id"] == user_id:
-            users_db[i].update({
-                "username": user.username,
-                "email": user.email
-            })
-            return users_db[i]
-    raise HTTPException(status_code=404, detail="User not found")
+    with cache_lock:
+        if user_id not in users_by_id:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        updated = users_by_id[user_id]
+        updated.update({
+            "username": user.username,
+            "email": user.email
+        })
+        invalidate_user(user_id)
+    return updated
 
 @app.delete("/users/{user_id}", tags=["Users"])
 def delete_user(
     user_id: int, 
     token: str = Depends(verify_token)
 ):
-    for i, user in enumerate(users_db):
-        if user["id"] == user_id:
-            del users_db[i]
-            return {"message": "User deleted"}
-    raise HTTPException(status_code=404, detail="User not found")
+    if not remove_user(user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return {"message": "User deleted"}
 
 # ----- Product Endpoints -----
 @app.get("/products", response_model=List[Product], tags=["Products"])
@@ -194,7 +348,7 @@ def create_order(
     token: str = Depends(verify_token)
 ):
     # Verify user exists
-    user_exists = any(u["id"] == order.user_id for u in users_db)
+    user_exists = order.user_id in users_by_id
     if not user_exists:
         raise HTTPException(status_code=400, detail="User not found")
     
@@ -223,19 +377,32 @@ def create_order(
         "created_at": datetime.now().isoformat()
     }
     
-    orders_db.append(new_order)
+    with cache_lock:
+        orders_db.append(new_order)
+        orders_list_cache.clear()
     return new_order
 
 @app.get("/orders", response_model=List[Order], tags=["Orders"])
-def get_orders(token: str = Depends(verify_token)):
-    return orders_db
+def get_orders(request: Request, token: str = Depends(verify_token)):
+    if len(orders_db) > ORDERS_STREAM_THRESHOLD:
+        return StreamingResponse(stream_json_array(orders_db.records()), media_type="application/json")
+    
+    with cache_lock:
+        entry = orders_list_cache.get(())
+        if entry is None:
+            entry = orders_list_cache[()] = cache_entry(list(orders_db.records()))
+    return json_response(entry, request)
 
 @app.get("/orders/{order_id}", response_model=Order, tags=["Orders"])
-def get_order(order_id: str, token: str = Depends(verify_token)):
-    for order in orders_db:
-        if order["id"] == order_id:
-            return order
-    raise HTTPException(status_code=404, detail="Order not found")
+def get_order(order_id: str, request: Request, token: str = Depends(verify_token)):
+    with cache_lock:
+        entry = order_cache.get(order_id)
+        if entry is None:
+            order = orders_db.get(order_id)
+            if order is None:
+                raise HTTPException(status_code=404, detail="Order not found")
+            entry = order_cache[order_id] = cache_entry(order)
+    return json_response(entry, request)
 
 # ----- Health Check Endpoint -----
 @app.get("/health", tags=["System"])
@@ -270,4 +437,6 @@ async def get_openapi_json():
     return app.openapi()
 
 if __name__ == "__main__":
-    uvicorn.run("sample_apis:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Auto-reload watches the source tree and is only wanted while developing (DEV=1).
+    # The sample data lives in process memory, so the server stays a single worker.
+    uvicorn.run("sample_apis:app", host="0.0.0.0", port=8000, reload=bool(os.getenv("DEV")))
\ No newline at end of file